@@ -20,22 +20,36 @@ Note:
 """
 
 import argparse
-import json
+import itertools
 import random
 import re
-import subprocess
+import sqlite3
+import string
 import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadCancelled, DownloadError
+
+_HASHTAG_RE = re.compile(r"#([A-Za-z0-9_]+)")
+# str.translate with a delete table leaves only the characters a TikTok username can't contain
+_USERNAME_STRIP = str.maketrans("", "", string.ascii_letters + string.digits + "._")
 
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 def safe_int(x: Any) -> Optional[int]:
+    # yt-dlp usually hands back real ints; skip the try/int() for those
+    if type(x) is int:
+        return x
     try:
         if x is None:
             return None
@@ -44,6 +58,9 @@ def safe_int(x: Any) -> Optional[int]:
         return None
 
 def safe_str(x: Any) -> Optional[str]:
+    if isinstance(x, str):
+        s = x.strip()
+        return s if s else None
     if x is None:
         return None
     s = str(x).strip()
@@ -52,16 +69,8 @@ def safe_str(x: Any) -> Optional[str]:
 def extract_hashtags(text: Optional[str]) -> List[str]:
     if not text:
         return []
-    tags = re.findall(r"#([A-Za-z0-9_]+)", text)
-    # de-dup while preserving order
-    seen = set()
-    out = []
-    for t in tags:
-        tl = t.lower()
-        if tl not in seen:
-            seen.add(tl)
-            out.append(tl)
-    return out
+    # de-dup while preserving order (dict.fromkeys keeps first-seen order)
+    return list(dict.fromkeys(t.lower() for t in _HASHTAG_RE.findall(text)))
 
 @dataclass
 class YtDlpResult:
@@ -71,63 +80,98 @@ class YtDlpResult:
     stderr: str = ""
 
 
-def run_ytdlp_json(
-    url: str,
+class _QuietLogger:
+    """Swallow yt-dlp's own console output; errors are surfaced via DownloadError instead."""
+
+    def debug(self, msg: str) -> None:
+        pass
+
+    def warning(self, msg: str) -> None:
+        pass
+
+    def error(self, msg: str) -> None:
+        pass
+
+
+class UserTimeout(DownloadCancelled):
+    msg = "timeout"
+
+
+class _DeadlineYoutubeDL(YoutubeDL):
+    """
+    YoutubeDL that refuses to start another HTTP request once the current user's deadline
+    has passed. socket_timeout only bounds a single read, so without this, extractor retries
+    or a long pager could keep one user going indefinitely. yt-dlp re-raises
+    DownloadCancelled subclasses untouched, so the timeout reaches run_ytdlp_json as-is.
+    """
+
+    deadline: Optional[float] = None
+
+    def urlopen(self, req):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise UserTimeout()
+        return super().urlopen(req)
+
+
+def make_ydl(
     max_videos: int,
     user_agent: Optional[str] = None,
     timeout_sec: int = 120,
-) -> YtDlpResult:
+) -> _DeadlineYoutubeDL:
     """
-    Run yt-dlp to fetch metadata JSON for a TikTok profile.
-    -J: dump JSON
-    --flat-playlist: avoids deep extraction / downloads; still gives usable metadata
-    --playlist-end: last N items
+    Build an in-process yt-dlp instance, equivalent to:
+      yt-dlp -J --flat-playlist --playlist-end N
+    extract_flat="in_playlist" is what --flat-playlist sets on the CLI.
     """
-    cmd = [
-        "yt-dlp",
-        "-J",
-        "--flat-playlist",
-        "--playlist-end", str(max_videos),
-        url,
-    ]
-
+    opts: Dict[str, Any] = {
+        "quiet": True,
+        "no_warnings": True,
+        "logger": _QuietLogger(),
+        "skip_download": True,
+        "extract_flat": "in_playlist",
+        "playlistend": max_videos,
+        "socket_timeout": timeout_sec,
+    }
     if user_agent:
-        cmd.extend(["--user-agent", user_agent])
+        opts["http_headers"] = {"User-Agent": user_agent}
+    return _DeadlineYoutubeDL(opts)
 
+
+def run_ytdlp_json(ydl: _DeadlineYoutubeDL, url: str, timeout_sec: int = 120) -> YtDlpResult:
+    """
+    Fetch metadata for a TikTok profile with an existing YoutubeDL instance.
+    Runs in-process, so there is no interpreter startup / import cost per user.
+    timeout_sec is a per-user deadline: no new request is started after it passes.
+    """
+    ydl.deadline = time.monotonic() + timeout_sec
     try:
-        p = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=timeout_sec,
-        )
-    except subprocess.TimeoutExpired:
+        info = ydl.extract_info(url, download=False)
+    except UserTimeout:
         return YtDlpResult(raw=None, error="timeout", returncode=124)
-    except FileNotFoundError:
-        return YtDlpResult(raw=None, error="yt-dlp not found. Install with: pip install yt-dlp", returncode=127)
+    except DownloadError as e:
+        msg = str(e).strip()
+        short_err = msg[-2000:] if len(msg) > 2000 else msg
+        return YtDlpResult(raw=None, error=short_err or "yt-dlp failed", returncode=1, stderr=msg)
     except Exception as e:
         return YtDlpResult(raw=None, error=f"exception: {e}", returncode=1)
+    finally:
+        ydl.deadline = None
 
-    stderr = (p.stderr or "").strip()
-    if p.returncode != 0:
-        short_err = stderr[-2000:] if len(stderr) > 2000 else stderr
-        return YtDlpResult(raw=None, error=short_err or "yt-dlp failed", returncode=p.returncode, stderr=stderr)
+    if not isinstance(info, dict):
+        return YtDlpResult(raw=None, error="yt-dlp returned no metadata", returncode=2)
 
-    try:
-        raw = json.loads(p.stdout)
-        return YtDlpResult(raw=raw, error=None, returncode=0, stderr=stderr)
-    except json.JSONDecodeError:
-        return YtDlpResult(raw=None, error="failed to parse yt-dlp JSON output", returncode=2, stderr=stderr)
+    # Use the info dict as-is: normalize_* only reads scalar fields from it, so the
+    # JSON-safe deep copy that `yt-dlp -J` makes (sanitize_info) isn't needed.
+    return YtDlpResult(raw=info, error=None, returncode=0)
 
 
-def normalize_profile(username: str, raw: Dict[str, Any]) -> Dict[str, Any]:
+def normalize_profile(username: str, profile_url: str, raw: Dict[str, Any]) -> Dict[str, Any]:
     """
     yt-dlp profile-level fields vary; return a stable profile object with best-effort mapping.
     """
     return {
         "username": username,
-        "profile_url": f"https://www.tiktok.com/@{username}",
+        "profile_url": profile_url,
         "uploader": safe_str(raw.get("uploader")),
         "uploader_id": safe_str(raw.get("uploader_id")),
         "channel": safe_str(raw.get("channel")),
@@ -170,18 +214,30 @@ def normalize_video_entry(e: Dict[str, Any], fallback_username: str) -> Dict[str
     }
 
 
-def normalize_user_payload(username: str, raw: Dict[str, Any], max_videos: int) -> Dict[str, Any]:
-    entries = raw.get("entries") or []
-    videos = []
-    for e in entries[:max_videos]:
-        if isinstance(e, dict):
-            videos.append(normalize_video_entry(e, username))
+def iter_video_entries(username: str, raw: Dict[str, Any], max_videos: int) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield normalized video entries, up to max_videos.
+    Works on any iterable of entries and never copies or slices the list.
+    """
+    entries = (e for e in raw.get("entries") or [] if isinstance(e, dict))
+    for e in itertools.islice(entries, max_videos):
+        yield normalize_video_entry(e, username)
+
+
+def normalize_user_payload(
+    username: str,
+    profile_url: str,
+    raw: Dict[str, Any],
+    max_videos: int,
+    scraped_at: Optional[str] = None,
+) -> Dict[str, Any]:
+    videos = list(iter_video_entries(username, raw, max_videos))
 
     return {
-        "scraped_at": now_iso(),
+        "scraped_at": scraped_at or now_iso(),
         "source": "yt-dlp",
         "requested_max_videos": max_videos,
-        "profile": normalize_profile(username, raw),
+        "profile": normalize_profile(username, profile_url, raw),
         "videos": videos,
     }
 
@@ -196,12 +252,10 @@ def read_seed_users(seed_path: Path) -> List[str]:
         if not u or u.startswith("#"):
             continue
         u = u.lstrip("@")
-        # basic sanity
-        if re.fullmatch(r"[A-Za-z0-9._]+", u) is None:
-            # still allow it, but keep the raw
-            users.append(u)
-        else:
-            users.append(u)
+        # basic sanity: still allow it, but keep the raw and say so
+        if u.translate(_USERNAME_STRIP):
+            print(f"WARNING: unusual username in seed file: {u!r}", file=sys.stderr)
+        users.append(u)
     # de-dup preserving order
     seen = set()
     out = []
@@ -212,16 +266,61 @@ def read_seed_users(seed_path: Path) -> List[str]:
     return out
 
 
+def open_cache(path: Path) -> sqlite3.Connection:
+    """
+    On-disk cache of normalized user payloads, so a rerun can skip users fetched recently.
+    One row per username (lowercased); each successful fetch replaces it.
+    """
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS cache ("
+        "username TEXT PRIMARY KEY, max_videos INTEGER, fetched_at INTEGER, payload BLOB)"
+    )
+    return conn
+
+
+def cache_get(
+    conn: sqlite3.Connection,
+    username: str,
+    max_videos: int,
+    ttl_sec: float,
+) -> Optional[Dict[str, Any]]:
+    """Return the cached payload if it is fresh and has at least max_videos worth of videos."""
+    row = conn.execute(
+        "SELECT payload FROM cache WHERE username = ? AND max_videos >= ? AND fetched_at > ?",
+        (username.lower(), max_videos, int(time.time() - ttl_sec)),
+    ).fetchone()
+    if row is None:
+        return None
+    try:
+        payload = orjson.loads(row[0])
+    except orjson.JSONDecodeError:
+        return None
+    payload["videos"] = (payload.get("videos") or [])[:max_videos]
+    payload["requested_max_videos"] = max_videos
+    return payload
+
+
+def cache_put(conn: sqlite3.Connection, username: str, max_videos: int, payload: Dict[str, Any]) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO cache (username, max_videos, fetched_at, payload) VALUES (?, ?, ?, ?)",
+        (username.lower(), max_videos, int(time.time()), orjson.dumps(payload)),
+    )
+    conn.commit()
+
+
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser(description="Collect TikTok metadata for seed usernames → JSON output.")
     ap.add_argument("--seed", type=str, default="../seeds/2026-02-01/tourism_boards_test.txt", help="Path to seed usernames file (one per line).")
     ap.add_argument("--out", type=str, default="outputs", help="Output directory.")
     ap.add_argument("--max-videos", type=int, default=20, help="Number of most recent videos to collect per user.")
-    ap.add_argument("--sleep", type=float, default=2.0, help="Base sleep seconds between users.")
+    ap.add_argument("--sleep", type=float, default=2.0, help="Base sleep seconds between users (per worker).")
     ap.add_argument("--jitter", type=float, default=1.5, help="Random jitter seconds added to sleep.")
-    ap.add_argument("--timeout", type=int, default=120, help="yt-dlp subprocess timeout in seconds per user.")
+    ap.add_argument("--timeout", type=int, default=120, help="Per-user time limit in seconds (also yt-dlp's socket timeout).")
+    ap.add_argument("--concurrency", type=int, default=1, help="Number of users fetched in parallel (default: 1).")
     ap.add_argument("--user-agent", type=str, default=None, help="Optional custom User-Agent string.")
-    ap.add_argument("--fail-fast", action="store_true", help="Stop on first error.")
+    ap.add_argument("--fail-fast", action="store_true", help="Stop on first error. With --concurrency > 1, users already being fetched still finish and are kept; queued users are skipped.")
+    ap.add_argument("--cache-ttl-hours", type=float, default=0, help="Reuse users fetched within this many hours from out/.cache.sqlite (default: 0 = disabled).")
     return ap.parse_args()
 
 
@@ -239,47 +338,109 @@ def main() -> int:
         return 2
 
     run_started_at = now_iso()
-    results: List[Dict[str, Any]] = []
-    errors: List[Dict[str, Any]] = []
 
     total = len(users)
     if total == 0:
         print("No usernames found in seed file.")
         return 0
 
-    print(f"Seed users: {total} | max_videos={args.max_videos}")
+    print(f"Seed users: {total} | max_videos={args.max_videos} | concurrency={args.concurrency}")
     print("Starting...\n")
 
-    for i, username in enumerate(users, start=1):
+    # YoutubeDL isn't documented as thread-safe, so each worker thread builds its own
+    # instance once and reuses it for every user it handles. All of them are
+    # closed (request handlers, cookie jar) once the pool has shut down.
+    local = threading.local()
+    ydls: List[YoutubeDL] = []
+
+    def fetch(username: str) -> Tuple[str, str, str, YtDlpResult]:
+        ydl = getattr(local, "ydl", None)
+        if ydl is None:
+            ydl = local.ydl = make_ydl(
+                max_videos=args.max_videos,
+                user_agent=args.user_agent,
+                timeout_sec=args.timeout,
+            )
+            ydls.append(ydl)
+
         profile_url = f"https://www.tiktok.com/@{username}"
-        print(f"[{i}/{total}] {username} … ", end="", flush=True)
+        y = run_ytdlp_json(ydl, profile_url, timeout_sec=args.timeout)
+        # one timestamp per user, shared by the success and error records
+        scraped_at = now_iso()
 
-        y = run_ytdlp_json(
-            url=profile_url,
-            max_videos=args.max_videos,
-            user_agent=args.user_agent,
-            timeout_sec=args.timeout,
-        )
+        # polite sleep, inside the worker so concurrency x rate stays bounded
+        delay = max(0.0, args.sleep + random.random() * args.jitter)
+        time.sleep(delay)
+        return username, profile_url, scraped_at, y
+
+    # keyed by seed position so the output keeps seed order regardless of completion order
+    results_by_idx: Dict[int, Dict[str, Any]] = {}
+    errors_by_idx: Dict[int, Dict[str, Any]] = {}
+
+    # Optional cache: users fetched within the TTL are reused without hitting TikTok
+    cache: Optional[sqlite3.Connection] = None
+    if args.cache_ttl_hours > 0:
+        cache = open_cache(out_dir / ".cache.sqlite")
+        for i, username in enumerate(users):
+            payload = cache_get(cache, username, args.max_videos, args.cache_ttl_hours * 3600)
+            if payload is not None:
+                results_by_idx[i] = payload
+        print(f"Cache: {len(results_by_idx)} users fetched within {args.cache_ttl_hours}h. Skipping them.\n")
+    skipped_existing = len(results_by_idx)
+
+    to_fetch = {i: username for i, username in enumerate(users) if i not in results_by_idx}
+
+    def record(n: int, i: int, fut: "Future[Tuple[str, str, str, YtDlpResult]]") -> bool:
+        """Log + store one fetched user. Returns True if it was an error."""
+        username, profile_url, scraped_at, y = fut.result()
+        print(f"[{n}/{len(to_fetch)}] {username} … ", end="", flush=True)
 
         if y.error or not y.raw:
             print("ERROR")
-            errors.append({
+            errors_by_idx[i] = {
                 "username": username,
                 "profile_url": profile_url,
-                "scraped_at": now_iso(),
+                "scraped_at": scraped_at,
                 "error": y.error or "unknown error",
                 "returncode": y.returncode,
-            })
-            if args.fail_fast:
-                break
-        else:
-            payload = normalize_user_payload(username, y.raw, args.max_videos)
-            results.append(payload)
-            print(f"OK ({len(payload['videos'])} videos)")
-
-        # polite sleep
-        delay = max(0.0, args.sleep + random.random() * args.jitter)
-        time.sleep(delay)
+            }
+            return True
+
+        payload = normalize_user_payload(
+            username, profile_url, y.raw, args.max_videos, scraped_at=scraped_at
+        )
+        results_by_idx[i] = payload
+        if cache is not None:
+            cache_put(cache, username, args.max_videos, payload)
+        print(f"OK ({len(payload['videos'])} videos)")
+        return False
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as ex:
+            futures = {ex.submit(fetch, username): i for i, username in to_fetch.items()}
+            pending = set(futures)
+
+            n = 0
+            for n, fut in enumerate(as_completed(futures), start=1):
+                pending.discard(fut)
+                if record(n, futures[fut], fut) and args.fail_fast:
+                    ex.shutdown(wait=False, cancel_futures=True)
+                    break
+
+            # --fail-fast only cancels users still queued; the ones already in flight
+            # finish anyway, so keep what TikTok sent instead of dropping it
+            in_flight = [f for f in pending if not f.cancelled()]
+            for n, fut in enumerate(as_completed(in_flight), start=n + 1):
+                record(n, futures[fut], fut)
+    finally:
+        for ydl in ydls:
+            ydl.close()
+
+    if cache is not None:
+        cache.close()
+
+    results = [results_by_idx[i] for i in sorted(results_by_idx)]
+    errors = [errors_by_idx[i] for i in sorted(errors_by_idx)]
 
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_file = out_dir / f"tiktok_seed_users_{ts}.json"
@@ -292,11 +453,13 @@ def main() -> int:
         "user_count_requested": total,
         "user_count_succeeded": len(results),
         "user_count_failed": len(errors),
+        "skipped_existing": skipped_existing,
         "results": results,
         "errors": errors,
     }
 
-    out_file.write_text(json.dumps(final_payload, indent=2), encoding="utf-8")
+    # orjson encodes straight to UTF-8 bytes, no intermediate str
+    out_file.write_bytes(orjson.dumps(final_payload, option=orjson.OPT_INDENT_2))
 
     print(f"\nDone. Wrote: {out_file}")
     if errors:
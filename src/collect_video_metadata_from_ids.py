@@ -33,27 +33,25 @@ Command line examples:
 """
 
 import argparse
+import asyncio
 import json
 import random
-import subprocess
-import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+import orjson
+
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def run_ytdlp_dump_json(
-    url: str,
-    timeout_sec: int = 180,
+def build_ytdlp_cmd(
     user_agent: Optional[str] = None,
     proxy: Optional[str] = None,
     attempt_comments: bool = True,
-) -> Tuple[Optional[Dict[str, Any]], Optional[str], int]:
-    """Returns: (json_dict or None, error_string or None, returncode)."""
+) -> List[str]:
     cmd = [
         "yt-dlp",
         "--no-download",
@@ -73,35 +71,216 @@ def run_ytdlp_dump_json(
     if proxy:
         cmd += ["--proxy", proxy]
 
-    cmd.append(url)
+    return cmd
+
 
+async def run_ytdlp_process(
+    cmd: List[str],
+    timeout_sec: int,
+) -> Tuple[Optional[bytes], Optional[bytes], Optional[str], int]:
+    """Returns: (stdout, stderr, error_string or None, returncode)."""
     try:
-        p = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=timeout_sec,
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
-    except subprocess.TimeoutExpired:
-        return None, "timeout", 124
     except FileNotFoundError:
-        return None, "yt-dlp not found (is your venv active? try `yt-dlp --version`)", 127
+        return None, None, "yt-dlp not found (is your venv active? try `yt-dlp --version`)", 127
     except Exception as e:
-        return None, f"exception: {e}", 1
+        return None, None, f"exception: {e}", 1
+
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout_sec)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return None, None, "timeout", 124
+    except asyncio.CancelledError:
+        # run is stopping early; don't leave yt-dlp running in the background
+        proc.kill()
+        await proc.wait()
+        raise
+
+    return stdout, stderr, None, proc.returncode
 
-    if p.returncode != 0:
-        err = (p.stderr or "").strip()
-        if len(err) > 2000:
-            err = err[-2000:]
-        return None, err or "yt-dlp failed", p.returncode
 
+def stderr_tail(stderr: Optional[bytes]) -> str:
+    err = (stderr or b"").decode("utf-8", errors="replace").strip()
+    return err[-2000:] if len(err) > 2000 else err
+
+
+async def run_ytdlp_dump_json(
+    url: str,
+    timeout_sec: int = 180,
+    user_agent: Optional[str] = None,
+    proxy: Optional[str] = None,
+    attempt_comments: bool = True,
+) -> Tuple[Optional[Dict[str, Any]], Optional[str], int]:
+    """Returns: (json_dict or None, error_string or None, returncode)."""
+    cmd = build_ytdlp_cmd(user_agent=user_agent, proxy=proxy, attempt_comments=attempt_comments)
+    cmd.append(url)
+
+    stdout, stderr, err, rc = await run_ytdlp_process(cmd, timeout_sec)
+    if err:
+        return None, err, rc
+
+    if rc != 0:
+        return None, stderr_tail(stderr) or "yt-dlp failed", rc
+
+    # stdout stays bytes: orjson parses it directly, no separate UTF-8 decode pass
     try:
-        return json.loads(p.stdout), None, 0
-    except json.JSONDecodeError:
+        return orjson.loads(stdout), None, 0
+    except orjson.JSONDecodeError:
         return None, "failed to parse yt-dlp JSON output", 2
 
 
+async def _pump_lines(
+    stream: asyncio.StreamReader,
+    name: str,
+    queue: "asyncio.Queue[Tuple[str, Optional[bytes]]]",
+) -> None:
+    """Forward complete lines from stream to queue; (name, None) marks EOF. No line-length limit."""
+    buf = bytearray()
+    while True:
+        chunk = await stream.read(1 << 16)
+        if not chunk:
+            break
+        start = len(buf)
+        buf.extend(chunk)
+        nl = buf.find(b"\n", start)
+        while nl >= 0:
+            await queue.put((name, bytes(buf[:nl])))
+            del buf[:nl + 1]
+            nl = buf.find(b"\n")
+    if buf:
+        await queue.put((name, bytes(buf)))
+    await queue.put((name, None))
+
+
+async def run_ytdlp_dump_json_batch(
+    urls: List[str],
+    timeout_sec: int = 180,
+    user_agent: Optional[str] = None,
+    proxy: Optional[str] = None,
+    attempt_comments: bool = True,
+) -> List[Tuple[Optional[Dict[str, Any]], Optional[str], int]]:
+    """
+    Same as run_ytdlp_dump_json, but one yt-dlp process handles every URL (fed via `-a -`),
+    so interpreter startup + extractor init is paid once per batch instead of once per video.
+    yt-dlp prints one JSON line per URL that worked and keeps going past failed ones.
+    Output is read as it arrives and timeout_sec applies per URL: if yt-dlp makes no progress
+    (no JSON line, no ERROR line; warnings don't count) for that long, it is killed. URLs that
+    already finished keep their results, the URL it was stuck on is marked as timed out and
+    the URLs it never reached are re-run in a fresh process.
+    Returns one (json_dict or None, error_string or None, returncode) per URL, in order.
+    """
+    if len(urls) == 1:
+        return [await run_ytdlp_dump_json(urls[0], timeout_sec, user_agent, proxy, attempt_comments)]
+
+    cmd = build_ytdlp_cmd(user_agent=user_agent, proxy=proxy, attempt_comments=attempt_comments)
+    cmd += ["-a", "-"]
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        return [(None, "yt-dlp not found (is your venv active? try `yt-dlp --version`)", 127)] * len(urls)
+    except Exception as e:
+        return [(None, f"exception: {e}", 1)] * len(urls)
+
+    infos: Dict[str, Dict[str, Any]] = {}
+    err_lines: List[str] = []
+    stderr_lines: List[str] = []
+    timed_out = False
+
+    queue: "asyncio.Queue[Tuple[str, Optional[bytes]]]" = asyncio.Queue()
+    pumps = [
+        asyncio.create_task(_pump_lines(proc.stdout, "out", queue)),
+        asyncio.create_task(_pump_lines(proc.stderr, "err", queue)),
+    ]
+    try:
+        try:
+            proc.stdin.write("\n".join(urls).encode("utf-8"))
+            await proc.stdin.drain()
+            proc.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # yt-dlp exited early; its stderr says why
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_sec
+        open_streams = len(pumps)
+        while open_streams:
+            try:
+                name, line = await asyncio.wait_for(queue.get(), timeout=max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                timed_out = True
+                proc.kill()
+                break
+
+            if line is None:
+                open_streams -= 1
+            elif name == "out":
+                if not line.strip():
+                    continue
+                try:
+                    info = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                if isinstance(info, dict):
+                    key = info.get("original_url") or info.get("webpage_url")
+                    if key:
+                        infos[key] = info
+                        deadline = loop.time() + timeout_sec
+            else:
+                text = line.decode("utf-8", errors="replace")
+                stderr_lines.append(text)
+                if text.startswith("ERROR"):
+                    err_lines.append(text)
+                    deadline = loop.time() + timeout_sec
+
+        await proc.wait()
+    except asyncio.CancelledError:
+        # run is stopping early; don't leave yt-dlp running in the background
+        proc.kill()
+        await proc.wait()
+        raise
+    finally:
+        for t in pumps:
+            t.cancel()
+
+    rc = proc.returncode
+    tail = "\n".join(stderr_lines).strip()[-2000:]
+
+    out: List[Tuple[Optional[Dict[str, Any]], Optional[str], int]] = []
+    for i, url in enumerate(urls):
+        info = infos.get(url)
+        if info is not None:
+            out.append((info, None, 0))
+            continue
+        # attribute yt-dlp's "ERROR: [TikTok] <video_id>: ..." lines back to their URL
+        vid = url.rstrip("/").rsplit("/", 1)[-1].split("?", 1)[0]
+        mine = [l for l in err_lines if vid and vid in l]
+        if mine:
+            out.append((None, "\n".join(mine), 1))
+        elif timed_out:
+            # yt-dlp works through URLs in order, so this is the one it hung on;
+            # the rest were never tried and get a fresh process instead of a "timeout" each
+            out.append((None, "timeout", 124))
+            if i + 1 < len(urls):
+                out += await run_ytdlp_dump_json_batch(
+                    urls[i + 1:], timeout_sec, user_agent, proxy, attempt_comments
+                )
+            break
+        else:
+            out.append((None, tail or "yt-dlp failed", rc or 1))
+    return out
+
+
 def extract_video_urls_from_seed_run(seed_run_json: Dict[str, Any]) -> List[Dict[str, str]]:
     """Returns list of {"video_id": "...", "url": "...", "username": "..."} items."""
     out: List[Dict[str, str]] = []
@@ -142,6 +321,150 @@ def existing_video_ids(per_video_dir: Path) -> Set[str]:
     return done
 
 
+async def enrich_videos(
+    videos: List[Dict[str, str]],
+    args: argparse.Namespace,
+    per_video_dir: Path,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[BaseException]]:
+    """
+    Enrich videos with up to --concurrency yt-dlp processes in flight on one event loop,
+    each handling --batch-size videos.
+    Returns (enriched, errors, failure): results and errors in input order, plus the
+    unexpected exception that stopped the run early, if any.
+    """
+    enriched: Dict[int, Dict[str, Any]] = {}
+    errors: Dict[int, Dict[str, Any]] = {}
+    total = len(videos)
+    done = 0
+    consecutive_errors = 0
+
+    sem = asyncio.Semaphore(max(1, args.concurrency))
+    stop = asyncio.Event()
+    tasks: List["asyncio.Task[None]"] = []
+
+    def stop_early(msg: str) -> None:
+        print(msg)
+        stop.set()
+        current = asyncio.current_task()
+        for t in tasks:
+            if t is not current:
+                t.cancel()
+
+    def record_result(
+        i: int,
+        item: Dict[str, str],
+        info: Optional[Dict[str, Any]],
+        err: Optional[str],
+        rc: int,
+    ) -> Optional[str]:
+        """Log + store one video's result. Returns a stop message if an error limit was hit."""
+        nonlocal done, consecutive_errors
+        vid = item["video_id"]
+        url = item["url"]
+
+        done += 1
+        print(f"[{done}/{total}] {vid} … ", end="", flush=True)
+
+        if err or not info:
+            print("ERROR")
+            consecutive_errors += 1
+
+            errors[i] = {
+                "video_id": vid,
+                "url": url,
+                "username": item.get("username"),
+                "scraped_at": now_iso(),
+                "returncode": rc,
+                "error": err or "unknown error",
+            }
+
+            # Optional: Stop after N consecutive errors 
+            # Default is 5; setting to 0 turns off the feature
+            if args.max_consecutive_errors > 0 and consecutive_errors >= args.max_consecutive_errors:
+                return (
+                    f"\nStopping early after {consecutive_errors} consecutive errors "
+                    f"(likely rate-limited or blocked)."
+                )
+
+            # Optional: stop after N total errors
+            # Default is 0; setting to 0 turns off the feature
+            if args.max_total_errors > 0 and len(errors) >= args.max_total_errors:
+                return f"\nStopping early after {len(errors)} total errors."
+
+        else:
+            print("OK")
+            record = {
+                "video_id": vid,
+                "url": url,
+                "username": item.get("username"),
+                "scraped_at": now_iso(),
+                "yt_dlp": info,
+            }
+            consecutive_errors = 0
+
+            enriched[i] = record
+
+            if args.write_per_video:
+                (per_video_dir / f"{vid}.json").write_text(
+                    json.dumps(record, indent=2),
+                    encoding="utf-8",
+                )
+
+        return None
+
+    async def enrich_batch(start: int, batch: List[Dict[str, str]]) -> None:
+        async with sem:
+            if stop.is_set():
+                return
+
+            outcomes = await run_ytdlp_dump_json_batch(
+                [item["url"] for item in batch],
+                timeout_sec=args.timeout,
+                user_agent=args.user_agent,
+                proxy=args.proxy,
+                attempt_comments=not args.no_comments,
+            )
+
+            # results already fetched are all kept, even if the batch trips an error limit
+            stop_msg = None
+            for offset, (item, (info, err, rc)) in enumerate(zip(batch, outcomes)):
+                stop_msg = record_result(start + offset, item, info, err, rc) or stop_msg
+            if stop_msg:
+                stop_early(stop_msg)
+                return
+
+            # delay to be less suspicious; held inside the semaphore so
+            # concurrency x request rate stays bounded. One delay per video in the
+            # batch keeps the average request rate the same as --batch-size 1.
+            for _ in batch:
+                await asyncio.sleep(max(0.0, args.sleep + random.random() * args.jitter))
+
+    size = max(1, args.batch_size)
+    tasks.extend(
+        asyncio.create_task(enrich_batch(start, videos[start:start + size]))
+        for start in range(0, len(videos), size)
+    )
+    # Cancellations come from stop_early and are expected; anything else is a real
+    # failure (e.g. a per-video write error): stop the other batches right away and
+    # hand it back so main() can save what was fetched before re-raising it.
+    failure: Optional[BaseException] = None
+    if tasks:
+        finished, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        failure = next(
+            (t.exception() for t in finished if not t.cancelled() and t.exception() is not None),
+            None,
+        )
+        if failure is not None:
+            stop_early(f"\nStopping early after an unexpected error: {failure!r}")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return (
+        [enriched[i] for i in sorted(enriched)],
+        [errors[i] for i in sorted(errors)],
+        failure,
+    )
+
+
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser(
         description="Enrich TikTok video IDs/URLs into per-video metadata JSON using yt-dlp"
@@ -151,6 +474,8 @@ def parse_args() -> argparse.Namespace:
     ap.add_argument("--sleep", type=float, default=2.0, help="Base sleep seconds between videos.")
     ap.add_argument("--jitter", type=float, default=1.5, help="Random extra sleep (0..jitter) seconds.")
     ap.add_argument("--timeout", type=int, default=180, help="yt-dlp timeout per video (seconds).")
+    ap.add_argument("--concurrency", type=int, default=1, help="Number of yt-dlp processes run in parallel (default: 1).")
+    ap.add_argument("--batch-size", type=int, default=1, help="Video URLs handled per yt-dlp process (default: 1).")
     ap.add_argument("--user-agent", default=None, help="Optional custom User-Agent.")
     ap.add_argument("--proxy", default=None, help="Optional proxy URL (e.g. http://host:port).")
     ap.add_argument("--no-comments", action="store_true", help="Do not attempt comment extraction.")
@@ -175,8 +500,8 @@ def main() -> int:
 
     # Load seed JSON and extract videos
     try:
-        seed_run = json.loads(in_path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as e:
+        seed_run = orjson.loads(in_path.read_bytes())
+    except orjson.JSONDecodeError as e:
         print(f"ERROR: input is not valid JSON: {in_path}")
         print(f"       {e}")
         return 2
@@ -202,77 +527,9 @@ def main() -> int:
         else:
             print("Resume: no existing per-video JSON files found to skip.")
 
-    enriched: List[Dict[str, Any]] = []
-    errors: List[Dict[str, Any]] = []
-
     print(f"Found {len(videos)} videos to enrich (after de-dup/optional skip)")
 
-    consecutive_errors = 0
-
-    for i, item in enumerate(videos, 1):
-        vid = item["video_id"]
-        url = item["url"]
-        print(f"[{i}/{len(videos)}] {vid} … ", end="", flush=True)
-
-        info, err, rc = run_ytdlp_dump_json(
-            url=url,
-            timeout_sec=args.timeout,
-            user_agent=args.user_agent,
-            proxy=args.proxy,
-            attempt_comments=not args.no_comments,
-        )
-
-        if err or not info:
-            print("ERROR")
-            consecutive_errors += 1
-
-            errors.append(
-                {
-                    "video_id": vid,
-                    "url": url,
-                    "username": item.get("username"),
-                    "scraped_at": now_iso(),
-                    "returncode": rc,
-                    "error": err or "unknown error",
-                }
-            )
-
-            # Optional: Stop after N consecutive errors 
-            # Default is 5; setting to 0 turns off the feature
-            if args.max_consecutive_errors > 0 and consecutive_errors >= args.max_consecutive_errors:
-                print(
-                    f"\nStopping early after {consecutive_errors} consecutive errors "
-                    f"(likely rate-limited or blocked)."
-                )
-                break
-
-            # Optional: stop after N total errors
-            # Default is 0; setting to 0 turns off the feature
-            if args.max_total_errors > 0 and len(errors) >= args.max_total_errors:
-                print(f"\nStopping early after {len(errors)} total errors.")
-                break
-
-        else:
-            print("OK")
-            record = {
-                "video_id": vid,
-                "url": url,
-                "username": item.get("username"),
-                "scraped_at": now_iso(),
-                "yt_dlp": info,
-            }
-            consecutive_errors = 0
-
-            enriched.append(record)
-
-            if args.write_per_video:
-                (per_video_dir / f"{vid}.json").write_text(
-                    json.dumps(record, indent=2),
-                    encoding="utf-8",
-                )
-
-        # delay to be less suspicious
-        time.sleep(max(0.0, args.sleep + random.random() * args.jitter))
+    enriched, errors, failure = asyncio.run(enrich_videos(videos, args, per_video_dir))
 
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_file = out_dir / f"videos_enriched_{ts}.json"
@@ -289,6 +546,10 @@ def main() -> int:
     }
     out_file.write_text(json.dumps(payload, indent=2), encoding="utf-8")
 
+    if failure is not None:
+        print(f"\nWrote partial results to: {out_file}")
+        raise failure
+
     print(f"\nDone. Wrote: {out_file}")
     if errors:
         print(f"Failures: {len(errors)} (TikTok often blocks comment/extra metadata access.)")
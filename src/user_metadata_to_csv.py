@@ -11,6 +11,7 @@ Input:
 
 Output:
   - ../outputs/csv_out/user_datauser_videos_<timestamp>.csv 
+  - or user_videos_<timestamp>.parquet with --format parquet (needs pyarrow)
 
 Timestamp strategy:
 - If run_started_at exists, script parses it and uses it for filename.
@@ -21,16 +22,17 @@ Timestamp strategy:
 from __future__ import annotations
 
 import argparse
-import json
+import csv
+import itertools
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
-import pandas as pd
+import orjson
 
 
 def read_json(path: Path) -> Any:
-    return json.loads(path.read_text(encoding="utf-8"))
+    return orjson.loads(path.read_bytes())
 
 
 def safe_get(d: Optional[Dict[str, Any]], key: str, default=None):
@@ -61,34 +63,60 @@ def filename_timestamp(run_started_at: Optional[str]) -> str:
     return dt.strftime("%Y%m%d_%H%M%S")
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--in", dest="in_path", required=True, help="Input seed users JSON file")
-    ap.add_argument("--out", dest="out_dir", required=True, help="Output directory for CSV")
-    ap.add_argument(
-        "--prefix",
-        default="user_videos",
-        help="Output filename prefix (default: user_videos)",
-    )
-    args = ap.parse_args()
-
-    in_path = Path(args.in_path).expanduser().resolve()
-    out_dir = Path(args.out_dir).expanduser().resolve()
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    data = read_json(in_path)
-
-    run_meta = {
-        "run_started_at": data.get("run_started_at"),
-        "run_finished_at": data.get("run_finished_at"),
-        "seed_file": data.get("seed_file"),
-        "requested_max_videos": data.get("requested_max_videos"),
-        "user_count_requested": data.get("user_count_requested"),
-        "user_count_succeeded": data.get("user_count_succeeded"),
-        "user_count_failed": data.get("user_count_failed"),
-    }
-
-    videos_rows: List[Dict[str, Any]] = []
+RUN_META_COLUMNS = (
+    "run_started_at",
+    "run_finished_at",
+    "seed_file",
+    "requested_max_videos",
+    "user_count_requested",
+    "user_count_succeeded",
+    "user_count_failed",
+)
+
+VIDEO_COLUMNS = RUN_META_COLUMNS + (
+    "user_scraped_at",
+    "user_source",
+    "username",
+    "profile_url",
+    "video_id",
+    "url",
+    "title",
+    "caption",
+    "timestamp",
+    "upload_date",
+    "duration_sec",
+    "uploader",
+    "uploader_id",
+    "view_count",
+    "like_count",
+    "comment_count",
+    "repost_count",
+    "hashtags",
+)
+
+# VIDEO_COLUMNS stored as int64 in Parquet; every other column is a string
+_INT_COLUMNS = {
+    "requested_max_videos",
+    "user_count_requested",
+    "user_count_succeeded",
+    "user_count_failed",
+    "timestamp",
+    "duration_sec",
+    "view_count",
+    "like_count",
+    "comment_count",
+    "repost_count",
+}
+
+PARQUET_ROW_GROUP = 65_536
+
+
+def iter_video_rows(data: Dict[str, Any]) -> Iterator[Tuple[Any, ...]]:
+    """
+    Yield one positional row per video, in VIDEO_COLUMNS order.
+    Tuples let csv.writer emit rows without a per-column dict lookup.
+    """
+    run_meta = tuple(data.get(k) for k in RUN_META_COLUMNS)
 
     for r in data.get("results", []):
         if not isinstance(r, dict):
@@ -107,36 +135,106 @@ def main():
                 continue
 
             hashtags = v.get("hashtags")
-            videos_rows.append({
-                **run_meta,
-                "user_scraped_at": scraped_at,
-                "user_source": source,
-                "username": username,
-                "profile_url": profile_url,
-
-                "video_id": v.get("video_id"),
-                "url": v.get("url"),
-                "title": v.get("title"),
-                "caption": v.get("caption"),
-                "timestamp": v.get("timestamp"),
-                "upload_date": v.get("upload_date"),
-                "duration_sec": v.get("duration_sec"),
-                "uploader": v.get("uploader"),
-                "uploader_id": v.get("uploader_id"),
-                "view_count": v.get("view_count"),
-                "like_count": v.get("like_count"),
-                "comment_count": v.get("comment_count"),
-                "repost_count": v.get("repost_count"),
-                "hashtags": ",".join(hashtags) if isinstance(hashtags, list) else None,
-            })
-
-    videos_df = pd.DataFrame(videos_rows)
+            yield (
+                *run_meta,
+                scraped_at,
+                source,
+                username,
+                profile_url,
+
+                v.get("video_id"),
+                v.get("url"),
+                v.get("title"),
+                v.get("caption"),
+                v.get("timestamp"),
+                v.get("upload_date"),
+                v.get("duration_sec"),
+                v.get("uploader"),
+                v.get("uploader_id"),
+                v.get("view_count"),
+                v.get("like_count"),
+                v.get("comment_count"),
+                v.get("repost_count"),
+                ",".join(hashtags) if isinstance(hashtags, list) else None,
+            )
+
+
+def write_csv(path: Path, rows: Iterable[Tuple[Any, ...]]) -> int:
+    """Stream rows to CSV; returns the row count."""
+    row_count = 0
+    with path.open("w", encoding="utf-8", newline="") as f:
+        videos_writer = csv.writer(f, lineterminator="\n")
+        videos_writer.writerow(VIDEO_COLUMNS)
+        for row in rows:
+            videos_writer.writerow(row)
+            row_count += 1
+    return row_count
+
+
+def write_parquet(path: Path, rows: Iterable[Tuple[Any, ...]]) -> int:
+    """
+    Stream rows to Parquet (zstd, dictionary-encoded strings), one row group per
+    PARQUET_ROW_GROUP rows. Uses a fixed schema so counts stay int64 instead of text.
+    Returns the row count.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("--format parquet needs pyarrow: pip install pyarrow")
+
+    schema = pa.schema([
+        (c, pa.int64() if c in _INT_COLUMNS else pa.string()) for c in VIDEO_COLUMNS
+    ])
+
+    row_count = 0
+    rows = iter(rows)
+    with pq.ParquetWriter(path, schema, compression="zstd", use_dictionary=True) as writer:
+        while True:
+            chunk = list(itertools.islice(rows, PARQUET_ROW_GROUP))
+            if not chunk:
+                break
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(zip(*chunk), schema)],
+                schema=schema,
+            ))
+            row_count += len(chunk)
+    return row_count
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="in_path", required=True, help="Input seed users JSON file")
+    ap.add_argument("--out", dest="out_dir", required=True, help="Output directory for CSV")
+    ap.add_argument(
+        "--prefix",
+        default="user_videos",
+        help="Output filename prefix (default: user_videos)",
+    )
+    ap.add_argument(
+        "--format",
+        choices=["csv", "parquet"],
+        default="csv",
+        help="Output format (default: csv; parquet needs pyarrow)",
+    )
+    args = ap.parse_args()
+
+    in_path = Path(args.in_path).expanduser().resolve()
+    out_dir = Path(args.out_dir).expanduser().resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    data = read_json(in_path)
 
     ts = filename_timestamp(data.get("run_started_at"))
-    out_csv = out_dir / f"{args.prefix}_{ts}.csv"
+    out_file = out_dir / f"{args.prefix}_{ts}.{args.format}"
+
+    # Rows are written as they are built, so memory doesn't grow with the video count
+    if args.format == "parquet":
+        row_count = write_parquet(out_file, iter_video_rows(data))
+    else:
+        row_count = write_csv(out_file, iter_video_rows(data))
 
-    videos_df.to_csv(out_csv, index=False)
-    print(f"Wrote {out_csv} (rows={len(videos_df):,}, cols={videos_df.shape[1]:,})")
+    print(f"Wrote {out_file} (rows={row_count:,}, cols={len(VIDEO_COLUMNS):,})")
 
 
 if __name__ == "__main__":
@@ -19,6 +19,7 @@ a folder of per-video JSONs - ../outputs/enriched/2026-02-01/per_video
 
 Output:
   - ../outputs/csv_out/video_data/videos_enriched_<timestamp>.csv
+  - or videos_enriched_<timestamp>.parquet with --format parquet (needs pyarrow)
 
 Timestamp priority:
 1) run_started_at (batch)
@@ -30,15 +31,16 @@ Timestamp priority:
 from __future__ import annotations
 
 import argparse
-import json
+import csv
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional
 
-import pandas as pd
+import orjson
 
 def read_json(path: Path) -> Any:
-    return json.loads(path.read_text(encoding="utf-8"))
+    return orjson.loads(path.read_bytes())
 
 
 def iter_inputs(path: Path) -> List[Path]:
@@ -59,24 +61,20 @@ def pick_best_format(formats: Any) -> Dict[str, Any]:
     if not isinstance(formats, list) or not formats:
         return {}
 
-    def score(fmt: Dict[str, Any]) -> Tuple[int, float, int]:
-        return (
-            int(fmt.get("height") or 0),
-            float(fmt.get("tbr") or 0.0),
-            int(fmt.get("filesize") or fmt.get("filesize_approx") or 0),
-        )
-
-    best, best_s = None, (-1, -1.0, -1)
-    for f in formats:
-        if not isinstance(f, dict):
-            continue
-        s = score(f)
-        if s > best_s:
-            best_s, best = s, f
-
-    if not isinstance(best, dict):
+    cands = [f for f in formats if isinstance(f, dict)]
+    if not cands:
         return {}
 
+    # max() keeps the first of equal scores, same as the old manual loop
+    best = max(
+        cands,
+        key=lambda f: (
+            int(f.get("height") or 0),
+            float(f.get("tbr") or 0.0),
+            int(f.get("filesize") or f.get("filesize_approx") or 0),
+        ),
+    )
+
     return {
         "best_format_id": best.get("format_id"),
         "best_ext": best.get("ext"),
@@ -89,11 +87,23 @@ def pick_best_format(formats: Any) -> Dict[str, Any]:
     }
 
 
+# preferred thumbnail ids, best first
+_THUMB_RANK = {"cover": 0, "originCover": 1, "dynamicCover": 2}
+
+
 def first_thumbnail(thumbnails: Any) -> Dict[str, Any]:
     if not isinstance(thumbnails, list) or not thumbnails:
         return {}
-    preferred = {t.get("id"): t for t in thumbnails if isinstance(t, dict)}
-    cover = preferred.get("cover") or preferred.get("originCover") or preferred.get("dynamicCover")
+    # one pass, no id->thumb dict: "cover" wins outright, otherwise the best fallback seen
+    cover, cover_rank = None, len(_THUMB_RANK)
+    for t in thumbnails:
+        if not isinstance(t, dict):
+            continue
+        r = _THUMB_RANK.get(t.get("id"), cover_rank)
+        if r < cover_rank:
+            cover, cover_rank = t, r
+            if r == 0:
+                break
     if isinstance(cover, dict):
         return {"thumb_id": cover.get("id"), "thumb_url": cover.get("url")}
     t0 = thumbnails[0] if isinstance(thumbnails[0], dict) else None
@@ -106,8 +116,7 @@ def normalize_record(item: Dict[str, Any], run_meta: Dict[str, Any]) -> Dict[str
     artists = yt.get("artists")
     artists_str = ",".join(artists) if isinstance(artists, list) else None
 
-    return {
-        **run_meta,
+    return run_meta | {
         "video_id": item.get("video_id") or yt.get("id"),
         "url": item.get("url") or yt.get("webpage_url") or yt.get("original_url"),
         "username": item.get("username") or yt.get("uploader"),
@@ -147,11 +156,123 @@ def normalize_record(item: Dict[str, Any], run_meta: Dict[str, Any]) -> Dict[str
         "extractor_key": yt.get("extractor_key"),
     }
 
+
+def write_csv(path: Path, rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    Write rows with csv.DictWriter (no DataFrame in between).
+    Columns are the union of row keys in first-seen order, like pandas would build them.
+    Returns the column list.
+    """
+    fieldnames = list(dict.fromkeys(k for r in rows for k in r))
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+        w.writeheader()
+        w.writerows(rows)
+    return fieldnames
+
+
+# Parquet types for every column main()/normalize_record() can produce, in output order,
+# so files from different runs share one schema even when a column is all-null in a run
+_PARQUET_TYPES = {
+    # batch run_meta / single-video source_file
+    "run_started_at": "string",
+    "source_input": "string",
+    "video_count_requested": "int64",
+    "video_count_succeeded": "int64",
+    "video_count_failed": "int64",
+    "attempted_comments": "bool",
+    "skipped_existing": "int64",
+    "source_file": "string",
+
+    "video_id": "string",
+    "url": "string",
+    "username": "string",
+    "scraped_at": "string",
+    "yt_id": "string",
+    "title": "string",
+    "description": "string",
+    "timestamp": "int64",
+    "duration": "double",  # yt-dlp gives int or float seconds
+    "view_count": "int64",
+    "like_count": "int64",
+    "comment_count": "int64",
+    "repost_count": "int64",
+    "save_count": "int64",
+    "channel": "string",
+    "channel_id": "string",
+    "uploader": "string",
+    "uploader_id": "string",
+    "track": "string",
+    "album": "string",
+    "artists": "string",
+
+    # pick_best_format / first_thumbnail
+    "best_format_id": "string",
+    "best_ext": "string",
+    "best_vcodec": "string",
+    "best_acodec": "string",
+    "best_width": "int64",
+    "best_height": "int64",
+    "best_tbr": "double",
+    "best_filesize": "int64",
+    "thumb_id": "string",
+    "thumb_url": "string",
+
+    "webpage_url": "string",
+    "original_url": "string",
+    "extractor": "string",
+    "extractor_key": "string",
+}
+
+_PARQUET_CASTS = {"string": str, "int64": int, "double": float, "bool": bool}
+
+
+def write_parquet(path: Path, rows: List[Dict[str, Any]]) -> List[str]:
+    """
+    Write rows to Parquet (zstd, dictionary-encoded strings).
+    Known columns always get their _PARQUET_TYPES type and appear even if no row has them;
+    any other column is inferred, falling back to strings if its values have mixed types.
+    Returns the column list.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("--format parquet needs pyarrow: pip install pyarrow")
+
+    fieldnames = list(_PARQUET_TYPES) + [
+        k for k in dict.fromkeys(k for r in rows for k in r) if k not in _PARQUET_TYPES
+    ]
+    arrays = []
+    for c in fieldnames:
+        values = [r.get(c) for r in rows]
+        type_name = _PARQUET_TYPES.get(c)
+        if type_name is None:
+            try:
+                arrays.append(pa.array(values))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+            continue
+
+        cast = _PARQUET_CASTS[type_name]
+        try:
+            values = [v if v is None or type(v) is cast else cast(v) for v in values]
+        except (TypeError, ValueError) as e:
+            raise SystemExit(f"column {c!r} does not fit Parquet type {type_name}: {e}")
+        arrays.append(pa.array(values, type=pa.type_for_alias(type_name)))
+
+    table = pa.Table.from_arrays(arrays, names=fieldnames)
+    pq.write_table(table, path, compression="zstd", use_dictionary=True)
+    return fieldnames
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--in", dest="in_path", required=True, help="Input JSON file OR folder")
     ap.add_argument("--out", dest="out_dir", required=True, help="Output directory")
     ap.add_argument("--prefix", default="videos_enriched", help="Filename prefix")
+    ap.add_argument("--workers", type=int, default=8, help="Threads used to read input JSON files (default: 8)")
+    ap.add_argument("--format", choices=["csv", "parquet"], default="csv", help="Output format (default: csv; parquet needs pyarrow)")
     args = ap.parse_args()
 
     in_path = Path(args.in_path).expanduser().resolve()
@@ -161,53 +282,55 @@ def main():
     rows: List[Dict[str, Any]] = []
     candidate_times: List[datetime] = []
 
-    for fp in iter_inputs(in_path):
-        data = read_json(fp)
-
-        # Batch file
-        if isinstance(data, dict) and isinstance(data.get("results"), list):
-            dt = parse_iso_dt(data.get("run_started_at"))
-            if dt:
-                candidate_times.append(dt)
-
-            run_meta = {
-                "run_started_at": data.get("run_started_at"),
-                "source_input": data.get("source_input"),
-                "video_count_requested": data.get("video_count_requested"),
-                "video_count_succeeded": data.get("video_count_succeeded"),
-                "video_count_failed": data.get("video_count_failed"),
-                "attempted_comments": data.get("attempted_comments"),
-                "skipped_existing": data.get("skipped_existing"),
-            }
-
-            for item in data["results"]:
-                if isinstance(item, dict):
-                    rows.append(normalize_record(item, run_meta))
-
-        # Single-video file
-        elif isinstance(data, dict):
-            dt = parse_iso_dt(data.get("scraped_at"))
-            if dt:
-                candidate_times.append(dt)
-
-            rows.append(
-                normalize_record(
-                    data,
-                    {"source_file": fp.name},
+    # Folder mode can be hundreds of files; overlap the reads/parses, keep file order
+    files = iter_inputs(in_path)
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        for fp, data in zip(files, ex.map(read_json, files)):
+            # Batch file
+            if isinstance(data, dict) and isinstance(data.get("results"), list):
+                dt = parse_iso_dt(data.get("run_started_at"))
+                if dt:
+                    candidate_times.append(dt)
+
+                run_meta = {
+                    "run_started_at": data.get("run_started_at"),
+                    "source_input": data.get("source_input"),
+                    "video_count_requested": data.get("video_count_requested"),
+                    "video_count_succeeded": data.get("video_count_succeeded"),
+                    "video_count_failed": data.get("video_count_failed"),
+                    "attempted_comments": data.get("attempted_comments"),
+                    "skipped_existing": data.get("skipped_existing"),
+                }
+
+                for item in data["results"]:
+                    if isinstance(item, dict):
+                        rows.append(normalize_record(item, run_meta))
+
+            # Single-video file
+            elif isinstance(data, dict):
+                dt = parse_iso_dt(data.get("scraped_at"))
+                if dt:
+                    candidate_times.append(dt)
+
+                rows.append(
+                    normalize_record(
+                        data,
+                        {"source_file": fp.name},
+                    )
                 )
-            )
-
-    df = pd.DataFrame(rows)
 
     if not candidate_times:
         ts = datetime.now()
     else:
         ts = min(candidate_times)
 
-    out_csv = out_dir / f"{args.prefix}_{ts.strftime('%Y%m%d_%H%M%S')}.csv"
-    df.to_csv(out_csv, index=False)
+    out_file = out_dir / f"{args.prefix}_{ts.strftime('%Y%m%d_%H%M%S')}.{args.format}"
+    if args.format == "parquet":
+        cols = write_parquet(out_file, rows)
+    else:
+        cols = write_csv(out_file, rows)
 
-    print(f"Wrote {out_csv} (rows={len(df):,}, cols={df.shape[1]:,})")
+    print(f"Wrote {out_file} (rows={len(rows):,}, cols={len(cols):,})")
 
 
 if __name__ == "__main__":